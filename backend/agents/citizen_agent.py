@@ -2,6 +2,7 @@ import os
 from dotenv import load_dotenv
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import SystemMessage, HumanMessage
+from utils.symptoms import CRITICAL_SYMPTOMS
 
 load_dotenv()
 
@@ -24,13 +25,8 @@ def generate_citizen_response(user_message: str, weather: dict):
     print(f"Citizen Agent: weather data - {weather}")
     
     # Check for critical symptoms that require emergency response only
-    critical_symptoms = [
-        "chest pain", "difficulty breathing", "unconscious", "bleeding",
-        "high fever", "fainting", "can't breathe", "heart attack", "stroke"
-    ]
-    
     user_message_lower = user_message.lower()
-    if any(symptom in user_message_lower for symptom in critical_symptoms):
+    if any(symptom in user_message_lower for symptom in CRITICAL_SYMPTOMS):
         print("Citizen Agent: Critical symptoms detected - returning emergency response")
         return "🚨 EMERGENCY: Call emergency services immediately (911). Do not delay medical attention."
     
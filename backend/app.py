@@ -9,6 +9,9 @@ from dotenv import load_dotenv
 from utils.weather_api import get_weather
 from utils.location_api import find_nearby_clinics
 from utils.overpass_api import find_medical_places
+from utils.geocoder import load_gazetteer, reverse_geocode
+from utils.interaction_log import InteractionLogger
+from utils.surge_analytics import SurgeAggregator, WINDOWS, FACILITY_SEARCH, classify_symptom
 from agents.citizen_agent import generate_citizen_response
 from agents.landing_agent import generate_landing_response
 
@@ -41,6 +44,30 @@ if users.count_documents({}) == 0:
     ])
     print("Users seeded")
 
+# Surge analytics - in-memory sliding windows, flushed to Mongo periodically
+surge = SurgeAggregator(db["surge_buckets"])
+
+# AI interaction log - buffered in memory, written to Mongo in batches
+# Set INTERACTION_SPILL_PATH to spill to disk instead of dropping under backpressure
+interaction_log = InteractionLogger(
+    db["interactions"],
+    spill_path=os.getenv("INTERACTION_SPILL_PATH")
+)
+
+
+@app.on_event("startup")
+def start_background_writers():
+    surge.start()
+    interaction_log.start()
+    # Load the offline gazetteer up front so the first lookup is fast
+    load_gazetteer()
+
+
+@app.on_event("shutdown")
+def stop_background_writers():
+    surge.stop()
+    interaction_log.stop()
+
 
 class LoginModel(BaseModel):
     email: str
@@ -178,6 +205,8 @@ def get_nearby_medical_facilities(
             "message": "Invalid longitude. Must be between -180 and 180"
         }
     
+    surge.record(lat, lon, FACILITY_SEARCH)
+    
     # Call Overpass API utility function with coordinates
     medical_places = find_medical_places(lat, lon)
     
@@ -189,6 +218,44 @@ def get_nearby_medical_facilities(
     }
 
 
+@app.get("/reverse-geocode")
+def get_reverse_geocode(
+    lat: float = Query(..., description="Latitude coordinate"),
+    lon: float = Query(..., description="Longitude coordinate")
+):
+    """
+    Resolve GPS coordinates to the nearest city name
+    
+    Uses a locally loaded gazetteer of populated places for offline lookups.
+    Nominatim is only called as a cached fallback when no place is close enough.
+    
+    Args:
+        lat: Latitude coordinate (required)
+        lon: Longitude coordinate (required)
+    
+    Returns:
+        JSON response with city, country and lookup source or error status
+    """
+    if not (-90 <= lat <= 90) or not (-180 <= lon <= 180):
+        return {
+            "success": False,
+            "message": "Invalid coordinates"
+        }
+    
+    location = reverse_geocode(lat, lon)
+    
+    if location:
+        return {
+            "success": True,
+            "location": location
+        }
+    else:
+        return {
+            "success": False,
+            "message": "Unable to resolve location"
+        }
+
+
 @app.post("/citizenai")
 def citizen_ai_assistant(data: CitizenAIModel):
     """
@@ -203,6 +270,8 @@ def citizen_ai_assistant(data: CitizenAIModel):
     """
     print(f"Citizen AI request: '{data.message}' at location: {data.lat}, {data.lon}")
     
+    surge.record(data.lat, data.lon, classify_symptom(data.message))
+    
     try:
         # Get weather data for location-aware health advice
         weather_data = get_weather(data.lat, data.lon)
@@ -221,6 +290,16 @@ def citizen_ai_assistant(data: CitizenAIModel):
         
         print("LangChain Citizen Agent: response generated successfully")
         
+        interaction_log.log(
+            "/citizenai",
+            message=data.message,
+            response=response,
+            weather=weather_data,
+            lat=data.lat,
+            lon=data.lon,
+            success=True
+        )
+        
         return {
             "success": True,
             "response": response,
@@ -233,6 +312,14 @@ def citizen_ai_assistant(data: CitizenAIModel):
         
     except Exception as e:
         print(f"Citizen AI error: {str(e)}")
+        interaction_log.log(
+            "/citizenai",
+            message=data.message,
+            error=str(e),
+            lat=data.lat,
+            lon=data.lon,
+            success=False
+        )
         return {
             "success": False,
             "message": "Health assistant temporarily unavailable. Please try again or consult a healthcare provider.",
@@ -257,12 +344,23 @@ def landing_ai_assistant(data: LandingAIModel):
     """
     print(f"Landing AI request: '{data.message}' at location: {data.lat}, {data.lon}")
     
+    surge.record(data.lat, data.lon, classify_symptom(data.message))
+    
     try:
         # Generate short, friendly response using Landing Agent
         response = generate_landing_response(data.message, data.lat, data.lon)
         
         print("Landing AI response generated successfully")
         
+        interaction_log.log(
+            "/landingai",
+            message=data.message,
+            response=response,
+            lat=data.lat,
+            lon=data.lon,
+            success=True
+        )
+        
         return {
             "success": True,
             "response": response,
@@ -274,6 +372,14 @@ def landing_ai_assistant(data: LandingAIModel):
         
     except Exception as e:
         print(f"Landing AI error: {str(e)}")
+        interaction_log.log(
+            "/landingai",
+            message=data.message,
+            error=str(e),
+            lat=data.lat,
+            lon=data.lon,
+            success=False
+        )
         return {
             "success": False,
             "message": "Wellness assistant temporarily unavailable. Please try again!",
@@ -282,3 +388,32 @@ def landing_ai_assistant(data: LandingAIModel):
                 "lon": data.lon
             }
         }
+
+
+@app.get("/surge")
+def get_surge_analytics(
+    window: str = Query("1h", description="Sliding window: 15m, 1h or 24h")
+):
+    """
+    Demand aggregates for the hospital dashboard
+    
+    Counts of /citizenai, /landingai and /nearby-medical requests grouped by
+    location tile and triage category. Totals are maintained incrementally
+    as requests arrive, so this endpoint only reads precomputed values.
+    
+    Args:
+        window: Sliding window name (optional, default 1h)
+    
+    Returns:
+        JSON response with total, by_category, by_tile and by_tile_category counts
+    """
+    if window not in WINDOWS:
+        return {
+            "success": False,
+            "message": f"Invalid window. Must be one of: {', '.join(WINDOWS)}"
+        }
+    
+    return {
+        "success": True,
+        "surge": surge.snapshot(window)
+    }
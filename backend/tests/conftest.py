@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import backend modules the same way app.py does (utils.*, agents.*)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+from utils.geocoder import Gazetteer, haversine_km
+
+
+def brute_force_nearest(gazetteer, lat, lon):
+    return min(
+        (haversine_km(lat, lon, place["lat"], place["lon"]), place["city"])
+        for place in gazetteer.places
+    )
+
+
+@pytest.fixture(scope="module")
+def world():
+    rng = random.Random(7)
+    gazetteer = Gazetteer()
+    for i in range(2000):
+        gazetteer.add(f"place-{i}", rng.uniform(-90, 90), rng.uniform(-180, 180), "XX")
+    return gazetteer
+
+
+def random_queries(seed, count, lat_range=(-90, 90)):
+    rng = random.Random(seed)
+    return [(rng.uniform(*lat_range), rng.uniform(-180, 180)) for _ in range(count)]
+
+
+def test_nearest_matches_brute_force(world):
+    for lat, lon in random_queries(1, 300):
+        place, distance = world.nearest(lat, lon)
+        expected_km, expected_city = brute_force_nearest(world, lat, lon)
+        assert distance == pytest.approx(expected_km)
+        assert place["city"] == expected_city
+
+
+def test_nearest_matches_brute_force_near_the_poles(world):
+    queries = random_queries(2, 100, (89.5, 90)) + random_queries(3, 100, (-90, -89.5))
+    for lat, lon in queries:
+        _, distance = world.nearest(lat, lon)
+        expected_km, _ = brute_force_nearest(world, lat, lon)
+        assert distance == pytest.approx(expected_km)
+
+
+def test_nearest_across_the_antimeridian():
+    gazetteer = Gazetteer()
+    gazetteer.add("east", 0.0, 179.9, "XX")
+    gazetteer.add("far", 0.0, 170.0, "XX")
+
+    place, distance = gazetteer.nearest(0.0, -179.9)
+
+    assert place["city"] == "east"
+    assert distance < 25
+
+
+def test_nearest_respects_max_km():
+    gazetteer = Gazetteer()
+    gazetteer.add("city", 23.0, 72.6, "IN")
+
+    assert gazetteer.nearest(23.1, 72.6, max_km=50)[0]["city"] == "city"
+    assert gazetteer.nearest(25.0, 72.6, max_km=50) == (None, None)
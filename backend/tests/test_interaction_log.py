@@ -0,0 +1,162 @@
+import json
+import os
+import threading
+import time
+
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from utils.interaction_log import InteractionLogger
+
+
+class FakeInteractionCollection:
+    """Stand-in for the interactions collection with scriptable failures"""
+
+    def __init__(self, failures=None, block=None):
+        self.documents = []
+        self.calls = []
+        # One entry per insert_many call: None (succeed), an exception, or a set of failing indices
+        self.failures = list(failures or [])
+        self.block = block
+
+    def insert_many(self, documents, ordered=True):
+        self.calls.append(len(documents))
+        if self.block is not None:
+            self.block.wait()
+            raise PyMongoError("server selection timeout")
+        failure = self.failures.pop(0) if self.failures else None
+        if isinstance(failure, Exception):
+            raise failure
+        failed = failure or set()
+        self.documents.extend(d for i, d in enumerate(documents) if i not in failed)
+        if failed:
+            raise BulkWriteError({"writeErrors": [{"index": i} for i in sorted(failed)]})
+
+
+def read_spill(path):
+    with open(path, "r", encoding="utf-8") as spill_file:
+        return [json.loads(line) for line in spill_file]
+
+
+def write_spill(path, messages, extra=""):
+    with open(path, "w", encoding="utf-8") as spill_file:
+        for message in messages:
+            spill_file.write(json.dumps({
+                "endpoint": "/citizenai",
+                "created_at": "2026-01-01T00:00:00+00:00",
+                "message": message,
+            }) + "\n")
+        spill_file.write(extra)
+
+
+def messages(documents):
+    return [document["message"] for document in documents]
+
+
+def test_full_queue_spills_to_disk(tmp_path):
+    spill_path = str(tmp_path / "spill.jsonl")
+    log = InteractionLogger(FakeInteractionCollection(), max_queue_size=2, spill_path=spill_path)
+
+    for i in range(5):
+        log.log("/citizenai", message=str(i))
+
+    assert log.spilled == 3
+    assert log.dropped == 0
+    assert messages(read_spill(spill_path)) == ["2", "3", "4"]
+
+
+def test_full_queue_drops_without_spill_path():
+    log = InteractionLogger(FakeInteractionCollection(), max_queue_size=2)
+
+    for i in range(5):
+        log.log("/citizenai", message=str(i))
+
+    assert log.dropped == 3
+    assert log.spilled == 0
+
+
+def test_partial_bulk_write_error_spills_only_failed_documents(tmp_path):
+    spill_path = str(tmp_path / "spill.jsonl")
+    collection = FakeInteractionCollection(failures=[{1}])
+    log = InteractionLogger(collection, batch_size=3, flush_interval=0.05, spill_path=spill_path)
+
+    for i in range(3):
+        log.log("/citizenai", message=str(i))
+    log.start()
+    log.stop()
+
+    assert messages(collection.documents) == ["0", "2"]
+    assert messages(read_spill(spill_path)) == ["1"]
+    assert log.spilled == 1
+
+
+def test_shutdown_drain_respects_deadline(tmp_path):
+    spill_path = str(tmp_path / "spill.jsonl")
+    unblock = threading.Event()
+    collection = FakeInteractionCollection(block=unblock)
+    log = InteractionLogger(collection, batch_size=10, flush_interval=0.05, spill_path=spill_path)
+
+    log.start()
+    for i in range(50):
+        log.log("/citizenai", message=str(i))
+
+    started = time.monotonic()
+    log.stop(timeout=0.2)
+    elapsed = time.monotonic() - started
+    unblock.set()
+
+    # The stuck insert would otherwise hold shutdown until it is unblocked
+    assert elapsed < 5
+    assert collection.calls == [10]
+    assert log.spilled == 40
+
+
+def test_spill_recovery_streams_batches_and_skips_truncated_line(tmp_path):
+    spill_path = str(tmp_path / "spill.jsonl")
+    write_spill(spill_path, [str(i) for i in range(5)], extra='{"endpoint": "/citizenai", "crea')
+    collection = FakeInteractionCollection()
+    log = InteractionLogger(collection, batch_size=2, flush_interval=0.05, spill_path=spill_path)
+
+    log.start()
+    assert log.recovery_done.wait(5)
+    log.stop()
+
+    assert collection.calls == [2, 2, 1]
+    assert messages(collection.documents) == ["0", "1", "2", "3", "4"]
+    assert not os.path.exists(spill_path)
+    assert not os.path.exists(spill_path + ".recovering")
+
+
+def test_spill_recovery_resumes_without_duplicates(tmp_path):
+    spill_path = str(tmp_path / "spill.jsonl")
+    write_spill(spill_path, [str(i) for i in range(6)])
+
+    # Mongo goes away after the first batch
+    first = FakeInteractionCollection(failures=[None, PyMongoError("down")])
+    log = InteractionLogger(first, batch_size=2, flush_interval=0.05, spill_path=spill_path)
+    log.start()
+    assert log.recovery_done.wait(5)
+    log.stop()
+    assert messages(first.documents) == ["0", "1"]
+    assert os.path.exists(spill_path + ".recovering")
+
+    second = FakeInteractionCollection()
+    log = InteractionLogger(second, batch_size=2, flush_interval=0.05, spill_path=spill_path)
+    log.start()
+    assert log.recovery_done.wait(5)
+    log.stop()
+    assert messages(second.documents) == ["2", "3", "4", "5"]
+    assert not os.path.exists(spill_path + ".recovering")
+
+
+def test_spill_recovery_keeps_failed_documents_for_next_start(tmp_path):
+    spill_path = str(tmp_path / "spill.jsonl")
+    write_spill(spill_path, ["0", "1", "2"])
+    collection = FakeInteractionCollection(failures=[{2}])
+    log = InteractionLogger(collection, batch_size=3, flush_interval=0.05, spill_path=spill_path)
+
+    log.start()
+    assert log.recovery_done.wait(5)
+    log.stop()
+
+    assert messages(collection.documents) == ["0", "1"]
+    assert messages(read_spill(spill_path)) == ["2"]
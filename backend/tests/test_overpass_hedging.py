@@ -0,0 +1,173 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils.overpass_api import OverpassMirrors, MAX_HEDGE_DELAY, EWMA_HALF_LIFE
+
+FAST_SECONDS = 0.01
+SLOW_SECONDS = 1.0
+
+
+class StubMirror:
+    """Local Overpass stand-in whose latency (or failure) is chosen per request"""
+
+    def __init__(self, name, latency=lambda count: FAST_SECONDS, status=200):
+        self.name = name
+        self.requests = 0
+        self._lock = threading.Lock()
+        mirror = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers["Content-Length"]))
+                with mirror._lock:
+                    mirror.requests += 1
+                    count = mirror.requests
+                time.sleep(latency(count))
+                body = json.dumps({"elements": [], "mirror": mirror.name}).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_port}/api/interpreter"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def stub_mirror():
+    mirrors = []
+
+    def make(*args, **kwargs):
+        mirror = StubMirror(*args, **kwargs)
+        mirrors.append(mirror)
+        return mirror
+
+    yield make
+    for mirror in mirrors:
+        mirror.close()
+
+
+def tail_latency(count):
+    # 2% of requests hit a slow tail, spaced so early samples stay fast
+    return SLOW_SECONDS if count % 50 == 30 else FAST_SECONDS
+
+
+def p99_latency(mirrors, queries=100):
+    latencies = []
+    for _ in range(queries):
+        started = time.monotonic()
+        mirrors.query("[out:json];")
+        latencies.append(time.monotonic() - started)
+    latencies.sort()
+    return latencies[int(0.99 * len(latencies)) - 1]
+
+
+def test_hedging_reduces_tail_latency(stub_mirror):
+    single = p99_latency(OverpassMirrors([stub_mirror("a", tail_latency).url]))
+
+    hedged = p99_latency(OverpassMirrors([
+        stub_mirror("b", tail_latency).url,
+        stub_mirror("c", tail_latency).url,
+    ]))
+
+    assert single >= SLOW_SECONDS
+    assert hedged < single / 2
+
+
+def test_failing_mirror_falls_through_immediately(stub_mirror):
+    broken = stub_mirror("broken", status=500)
+    healthy = stub_mirror("healthy")
+    mirrors = OverpassMirrors([broken.url, healthy.url])
+    # Make the broken mirror the primary
+    mirrors.record_latency(broken.url, 0.001)
+    mirrors.record_latency(healthy.url, 0.5)
+
+    started = time.monotonic()
+    data = mirrors.query("[out:json];")
+
+    assert data["mirror"] == "healthy"
+    assert broken.requests == 1
+    assert healthy.requests == 1
+    # No primary samples yet, so the hedge delay is MAX_HEDGE_DELAY; falling
+    # through on the error must not wait for it
+    assert time.monotonic() - started < MAX_HEDGE_DELAY / 2
+
+
+def test_fastest_mirror_by_ewma_is_tried_first(stub_mirror):
+    slow = stub_mirror("slow")
+    fast = stub_mirror("fast")
+    mirrors = OverpassMirrors([slow.url, fast.url])
+    mirrors.record_latency(slow.url, 2.0)
+    mirrors.record_latency(fast.url, 0.05)
+
+    assert mirrors.ranked_urls()[0] == fast.url
+    assert mirrors.query("[out:json];")["mirror"] == "fast"
+    assert slow.requests == 0
+
+
+def test_failed_mirror_is_reprobed_after_its_penalty_decays():
+    mirrors = OverpassMirrors(["https://a.example", "https://b.example"])
+    mirrors.record_latency("https://a.example", 30, success=False, now=0)
+    mirrors.record_latency("https://b.example", 0.05, now=0)
+    assert mirrors.ranked_urls(now=1)[0] == "https://b.example"
+
+    # b keeps answering quickly; a gets no samples but its penalty decays
+    later = 10 * EWMA_HALF_LIFE
+    for second in range(0, int(later) + 1, 5):
+        mirrors.record_latency("https://b.example", 0.05, now=second)
+    assert mirrors.ranked_urls(now=later)[0] == "https://a.example"
+
+
+def test_only_primary_latencies_set_the_hedge_delay():
+    mirrors = OverpassMirrors(["https://a.example", "https://b.example"])
+    mirrors.record_latency("https://b.example", 4.0, primary=False)
+    assert mirrors.hedge_delay() == MAX_HEDGE_DELAY
+
+    for _ in range(20):
+        mirrors.record_latency("https://a.example", 0.5, primary=True)
+    assert mirrors.hedge_delay() == 0.5
+
+
+def test_concurrent_queries_do_not_queue_behind_each_other(stub_mirror):
+    upstream = 0.2
+
+    def concurrent_max_latency(max_concurrency):
+        mirror = stub_mirror("steady", lambda count: upstream)
+        spare = stub_mirror("spare")
+        mirrors = OverpassMirrors([mirror.url, spare.url], max_concurrency=max_concurrency)
+        mirrors.record_latency(mirror.url, 0.001)
+        mirrors.record_latency(spare.url, 1.0)
+
+        def timed_query(_):
+            started = time.monotonic()
+            mirrors.query("[out:json];")
+            return time.monotonic() - started
+
+        with ThreadPoolExecutor(max_workers=30) as callers:
+            latencies = list(callers.map(timed_query, range(30)))
+
+        # One request per query: queue time must not trigger hedges
+        assert mirror.requests == 30
+        assert spare.requests == 0
+        return max(latencies)
+
+    sized = concurrent_max_latency(max_concurrency=30)
+    # Two workers serve 30 queries in about 15 rounds of the upstream latency
+    undersized = concurrent_max_latency(max_concurrency=1)
+
+    assert sized < undersized / 3
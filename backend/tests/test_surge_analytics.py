@@ -0,0 +1,116 @@
+from pymongo.errors import PyMongoError
+
+from utils.surge_analytics import SurgeAggregator, classify_symptom, location_tile
+
+T0 = 1_700_000_040  # start of a minute bucket
+
+
+class FakeSurgeCollection:
+    """Stand-in for the surge_buckets collection, applying $inc upserts in memory"""
+
+    def __init__(self, fail_writes=0):
+        self.counts = {}
+        self.fail_writes = fail_writes
+
+    def bulk_write(self, operations, ordered=True):
+        if self.fail_writes:
+            self.fail_writes -= 1
+            raise PyMongoError("server selection timeout")
+        for operation in operations:
+            key = tuple(operation._filter[field] for field in ("bucket_start", "tile", "category"))
+            self.counts[key] = self.counts.get(key, 0) + operation._doc["$inc"]["count"]
+
+    def find(self, query):
+        oldest = query["bucket_start"]["$gte"]
+        return FakeCursor(
+            {"bucket_start": bucket_start, "tile": tile, "category": category, "count": count}
+            for (bucket_start, tile, category), count in self.counts.items()
+            if bucket_start >= oldest
+        )
+
+
+class FakeCursor(list):
+    def sort(self, field, direction):
+        return FakeCursor(sorted(self, key=lambda document: document[field], reverse=direction < 0))
+
+
+def test_classify_symptom_matches_whole_words():
+    assert classify_symptom("I have the flu") == "fever"
+    assert classify_symptom("how much fluid should I drink") == "general"
+    assert classify_symptom("heartburn after dinner") == "digestive"
+    assert classify_symptom("acute back pain") == "general"
+    assert classify_symptom("two cuts on my arm") == "injury"
+    assert classify_symptom("chest pain and high fever") == "emergency"
+
+
+def test_location_tile_snaps_on_boundaries():
+    assert location_tile(23.05, 72.6) == "23.05,72.60"
+    assert location_tile(0.15, -0.01) == "0.15,-0.05"
+    assert location_tile(23.0499, 72.5999) == "23.00,72.55"
+
+
+def test_invalid_coordinates_are_not_recorded():
+    surge = SurgeAggregator()
+    assert not surge.record(float("nan"), 72.6, "fever", now=T0)
+    assert not surge.record(23.0, float("inf"), "fever", now=T0)
+    assert not surge.record(123.0, 72.6, "fever", now=T0)
+    assert surge.snapshot("24h", now=T0)["total"] == 0
+
+
+def test_windows_expire_old_buckets():
+    surge = SurgeAggregator()
+    surge.record(23.0, 72.6, "fever", now=T0)
+    surge.record(23.0, 72.6, "heat", now=T0 + 20 * 60)
+
+    at = T0 + 20 * 60
+    assert surge.snapshot("15m", now=at)["by_category"] == {"heat": 1}
+    assert surge.snapshot("1h", now=at)["total"] == 2
+    assert surge.snapshot("1h", now=T0 + 70 * 60)["by_category"] == {"heat": 1}
+    assert surge.snapshot("24h", now=T0 + 25 * 3600)["total"] == 0
+
+
+def test_out_of_order_buckets_still_expire():
+    surge = SurgeAggregator()
+    surge.record(23.0, 72.6, "fever", now=T0)
+    surge.record(23.0, 72.6, "fever", now=T0 - 30)
+
+    assert surge.snapshot("15m", now=T0 - 30 + 15 * 60 + 30)["total"] == 1
+
+
+def test_late_record_into_expired_bucket_is_not_counted_in_that_window():
+    surge = SurgeAggregator()
+    surge.record(23.0, 72.6, "fever", now=T0)
+    surge.record(23.0, 72.6, "fever", now=T0 + 20 * 60)
+    # Lands in the T0 bucket, which the 15m window has already dropped
+    surge.record(23.0, 72.6, "fever", now=T0 + 10)
+
+    assert surge.snapshot("15m", now=T0 + 20 * 60)["total"] == 1
+    assert surge.snapshot("1h", now=T0 + 20 * 60)["total"] == 3
+
+
+def test_load_recent_restores_windows_from_flushed_buckets():
+    collection = FakeSurgeCollection()
+    before = SurgeAggregator(collection)
+    before.record(23.0, 72.6, "fever", now=T0 - 25 * 3600)
+    before.record(23.0, 72.6, "fever", now=T0 - 2 * 3600)
+    before.record(23.0, 72.6, "heat", now=T0 - 60)
+    before.record(23.0, 72.6, "heat", now=T0 - 60)
+    before.flush()
+
+    after = SurgeAggregator(collection)
+    assert after.load_recent(now=T0) == 2
+
+    assert after.snapshot("15m", now=T0)["by_category"] == {"heat": 2}
+    assert after.snapshot("24h", now=T0)["by_category"] == {"fever": 1, "heat": 2}
+
+
+def test_failed_flush_is_retried():
+    collection = FakeSurgeCollection(fail_writes=1)
+    surge = SurgeAggregator(collection)
+    surge.record(23.0, 72.6, "fever", now=T0)
+
+    assert surge.flush() == 0
+    surge.record(23.0, 72.6, "fever", now=T0 + 1)
+    assert surge.flush() == 1
+
+    assert collection.counts == {(T0, "23.00,72.60", "fever"): 2}
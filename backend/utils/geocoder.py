@@ -0,0 +1,298 @@
+import math
+import os
+import threading
+from collections import OrderedDict
+
+import requests
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# GeoNames-style dump of populated places (e.g. cities15000.txt from
+# https://download.geonames.org/export/dump/). A countryInfo.txt file in the
+# same directory, if present, is used to turn country codes into names.
+GAZETTEER_PATH = os.getenv("GAZETTEER_PATH", os.path.join(os.path.dirname(__file__), "..", "data", "cities15000.txt"))
+
+# Size of one grid index cell in degrees
+GRID_CELL_DEG = 1.0
+
+# Nearest places further away than this are not trusted and go to the fallback
+MAX_DISTANCE_KM = 50
+
+# Nominatim fallback for coordinates the gazetteer cannot resolve
+NOMINATIM_FALLBACK = os.getenv("NOMINATIM_FALLBACK", "true").lower() == "true"
+FALLBACK_CACHE_SIZE = 1024
+# Coordinates are rounded to this many decimals for the cache key (~1km)
+FALLBACK_CACHE_PRECISION = 2
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float):
+    """Great-circle distance between two GPS coordinates in kilometres"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class Gazetteer:
+    """
+    In-memory nearest-place index over a GeoNames-style gazetteer
+
+    Places are bucketed into GRID_CELL_DEG x GRID_CELL_DEG cells. A lookup
+    scans the cells under the bounding box of a spherical cap around the
+    query point (exact longitude extent, all longitudes once the cap reaches
+    a pole), growing the cap until the best match lies inside it, so only a
+    handful of places are compared per query.
+    """
+
+    def __init__(self):
+        self.places = []
+        self._grid = {}
+
+    def load(self, path: str):
+        """
+        Load populated places from a GeoNames tab-separated dump
+
+        Args:
+            path: Path to the dump file (geonameid, name, asciiname,
+                  alternatenames, latitude, longitude, ..., country code, ...)
+
+        Returns:
+            int: Number of places loaded
+        """
+        country_names = self._load_country_names(os.path.join(os.path.dirname(path), "countryInfo.txt"))
+
+        with open(path, "r", encoding="utf-8") as dump:
+            for line in dump:
+                fields = line.rstrip("\n").split("\t")
+                if len(fields) < 9 or fields[6] != "P":
+                    # Only populated places (feature class P)
+                    continue
+                try:
+                    lat = float(fields[4])
+                    lon = float(fields[5])
+                except ValueError:
+                    continue
+                country_code = fields[8]
+                self.add(fields[1], lat, lon, country_names.get(country_code, country_code))
+
+        print(f"Gazetteer loaded: {len(self.places)} places")
+        return len(self.places)
+
+    @staticmethod
+    def _load_country_names(path: str):
+        names = {}
+        if not os.path.exists(path):
+            return names
+        with open(path, "r", encoding="utf-8") as info:
+            for line in info:
+                if line.startswith("#"):
+                    continue
+                fields = line.split("\t")
+                if len(fields) > 4:
+                    # ISO code is column 0, country name column 4
+                    names[fields[0]] = fields[4]
+        return names
+
+    def add(self, name: str, lat: float, lon: float, country: str):
+        """Add one place to the index"""
+        index = len(self.places)
+        self.places.append({"city": name, "country": country, "lat": lat, "lon": lon})
+        self._grid.setdefault(self._cell(lat, lon), []).append(index)
+
+    @staticmethod
+    def _cell(lat: float, lon: float):
+        return (math.floor(lat / GRID_CELL_DEG), math.floor(lon / GRID_CELL_DEG))
+
+    def nearest(self, lat: float, lon: float, max_km: float = None):
+        """
+        Find the populated place closest to the given coordinates
+
+        Args:
+            lat: Latitude coordinate (float)
+            lon: Longitude coordinate (float)
+            max_km: Stop searching beyond this distance (optional)
+
+        Returns:
+            tuple: (place dict, distance in km), or (None, None) if nothing was found
+        """
+        if not self.places:
+            return None, None
+
+        half_circumference_km = math.pi * EARTH_RADIUS_KM
+        radius_km = GRID_CELL_DEG * half_circumference_km / 180
+        if max_km is not None:
+            radius_km = min(radius_km, max_km)
+
+        while True:
+            best, best_km = self._nearest_in_cap(lat, lon, radius_km)
+            # Every place within radius_km was compared, so a hit inside it is final
+            if best is not None and best_km <= radius_km:
+                return best, best_km
+            if max_km is not None and radius_km >= max_km:
+                return None, None
+            if radius_km >= half_circumference_km:
+                return best, best_km
+
+            # Grow to the best candidate seen (one more pass settles it) or double
+            radius_km = best_km if best is not None else radius_km * 2
+            radius_km = min(radius_km, half_circumference_km)
+            if max_km is not None:
+                radius_km = min(radius_km, max_km)
+
+    def _nearest_in_cap(self, lat: float, lon: float, radius_km: float):
+        # Scan the grid cells covering the bounding box of the spherical cap
+        # of radius_km around the query point
+        radius_deg = math.degrees(radius_km / EARTH_RADIUS_KM)
+        lat_min, lat_max = lat - radius_deg, lat + radius_deg
+
+        cells = int(360 / GRID_CELL_DEG)
+        if lat_min <= -90 or lat_max >= 90:
+            # The cap contains a pole, so it spans every longitude
+            lon_cells = range(cells)
+        else:
+            ratio = math.sin(math.radians(radius_deg)) / math.cos(math.radians(lat))
+            lon_extent = 180.0 if ratio >= 1 else math.degrees(math.asin(ratio))
+            first = math.floor((lon - lon_extent) / GRID_CELL_DEG)
+            last = math.floor((lon + lon_extent) / GRID_CELL_DEG)
+            lon_cells = range(cells) if last - first + 1 >= cells else range(first, last + 1)
+
+        lat_cells = range(
+            math.floor(max(-90.0, lat_min) / GRID_CELL_DEG),
+            math.floor(min(90.0, lat_max) / GRID_CELL_DEG) + 1
+        )
+
+        best, best_km = None, None
+        for cell_lat in lat_cells:
+            for cell_lon in lon_cells:
+                for index in self._grid.get((cell_lat, self._wrap_lon_cell(cell_lon)), ()):
+                    place = self.places[index]
+                    distance = haversine_km(lat, lon, place["lat"], place["lon"])
+                    if best_km is None or distance < best_km:
+                        best, best_km = place, distance
+        return best, best_km
+
+    @staticmethod
+    def _wrap_lon_cell(cell: int):
+        cells = int(360 / GRID_CELL_DEG)
+        offset = int(180 / GRID_CELL_DEG)
+        return (cell + offset) % cells - offset
+
+
+gazetteer = Gazetteer()
+_gazetteer_lock = threading.Lock()
+_gazetteer_loaded = False
+
+_fallback_cache = OrderedDict()
+_fallback_lock = threading.Lock()
+
+
+def load_gazetteer(path: str = GAZETTEER_PATH):
+    """
+    Load the gazetteer once; safe to call from several threads
+
+    Returns:
+        bool: True if places are available for offline lookups
+    """
+    global _gazetteer_loaded
+    with _gazetteer_lock:
+        if not _gazetteer_loaded:
+            _gazetteer_loaded = True
+            try:
+                gazetteer.load(path)
+            except OSError as e:
+                print(f"Gazetteer not loaded: {str(e)}")
+            if not gazetteer.places:
+                print("WARNING: gazetteer is empty - every reverse geocode will "
+                      + ("fall back to Nominatim (1 req/s limit)" if NOMINATIM_FALLBACK else "fail")
+                      + ". See README 'Download the Gazetteer' to fetch cities15000.txt.")
+    return bool(gazetteer.places)
+
+
+def reverse_geocode(lat: float, lon: float):
+    """
+    Resolve GPS coordinates to the nearest city name
+
+    Looks the coordinates up in the local gazetteer first. If no place lies
+    within MAX_DISTANCE_KM, falls back to Nominatim (when enabled), caching
+    its answers by rounded coordinates.
+
+    Args:
+        lat: Latitude coordinate (float)
+        lon: Longitude coordinate (float)
+
+    Returns:
+        dict: city, country, source ("gazetteer" or "nominatim") and
+              distance_km, or None if the location could not be resolved
+    """
+    load_gazetteer()
+
+    place, distance_km = gazetteer.nearest(lat, lon, max_km=MAX_DISTANCE_KM)
+    if place is not None:
+        return {
+            "city": place["city"],
+            "country": place["country"],
+            "source": "gazetteer",
+            "distance_km": round(distance_km, 2)
+        }
+
+    if not NOMINATIM_FALLBACK:
+        return None
+
+    return _nominatim_reverse_cached(lat, lon)
+
+
+def _nominatim_reverse_cached(lat: float, lon: float):
+    key = (round(lat, FALLBACK_CACHE_PRECISION), round(lon, FALLBACK_CACHE_PRECISION))
+
+    with _fallback_lock:
+        if key in _fallback_cache:
+            _fallback_cache.move_to_end(key)
+            return _fallback_cache[key]
+
+    location = _nominatim_reverse(lat, lon)
+
+    # Only successful answers are cached so transient errors are retried
+    if location is not None:
+        with _fallback_lock:
+            _fallback_cache[key] = location
+            if len(_fallback_cache) > FALLBACK_CACHE_SIZE:
+                _fallback_cache.popitem(last=False)
+    return location
+
+
+def _nominatim_reverse(lat: float, lon: float):
+    print(f"Reverse geocode fallback to Nominatim for coordinates: {lat}, {lon}")
+
+    url = "https://nominatim.openstreetmap.org/reverse"
+    params = {"lat": lat, "lon": lon, "format": "json"}
+
+    # Custom User-Agent header required by Nominatim API
+    headers = {
+        "User-Agent": "SurgeSense/1.0 (healthcare-app)"
+    }
+
+    try:
+        response = requests.get(url, params=params, headers=headers, timeout=10)
+        response.raise_for_status()
+
+        address = response.json().get("address", {})
+        city = address.get("city") or address.get("town") or address.get("village")
+        if not city:
+            return None
+
+        return {
+            "city": city,
+            "country": address.get("country", ""),
+            "source": "nominatim",
+            "distance_km": None
+        }
+
+    except requests.exceptions.RequestException as e:
+        print(f"Reverse geocode error: {str(e)}")
+        return None
+    except ValueError as e:
+        print(f"Reverse geocode error: Invalid response format - {str(e)}")
+        return None
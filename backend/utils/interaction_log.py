@@ -0,0 +1,264 @@
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+
+from pymongo.errors import BulkWriteError, PyMongoError
+
+
+class InteractionLogger:
+    """
+    Write-behind log of AI interactions backed by a MongoDB collection
+
+    Request handlers only put a document on a bounded in-memory queue.
+    A background thread drains the queue and writes documents with
+    insert_many once batch_size documents are waiting or flush_interval
+    seconds have passed. When the queue is full (or Mongo rejects a batch)
+    documents are appended to spill_path as JSON lines if one is set,
+    otherwise they are dropped and counted. Spilled documents are streamed
+    back into Mongo in batches by the writer thread the next time the logger
+    starts. Shutdown drains the queue up to a deadline and spills or drops
+    whatever is left.
+    """
+
+    def __init__(
+        self,
+        collection,
+        max_queue_size: int = 10000,
+        batch_size: int = 100,
+        flush_interval: float = 2.0,
+        spill_path: str = None,
+    ):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spill_path = spill_path
+        self.dropped = 0
+        self.spilled = 0
+        self._reported_overflow = (0, 0)
+
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._spill_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        # Set once the writer thread has finished (or paused) spill recovery
+        self.recovery_done = threading.Event()
+        self._drain_deadline = float("inf")
+        self._writer_thread = None
+
+    def log(self, endpoint: str, **fields):
+        """
+        Queue one interaction for writing; never blocks the request path
+
+        Args:
+            endpoint: Name of the API endpoint, e.g. "/citizenai"
+            **fields: Extra fields stored on the document (message, response, ...)
+        """
+        document = {
+            "endpoint": endpoint,
+            "created_at": datetime.now(timezone.utc),
+            **fields,
+        }
+        try:
+            self._queue.put_nowait(document)
+        except queue.Full:
+            self._overflow([document])
+
+    def start(self):
+        """Start the background writer thread, which first recovers any spilled documents"""
+        if self._writer_thread is not None:
+            return
+        self._stop_event.clear()
+        self._writer_thread = threading.Thread(
+            target=self._writer_loop, name="interaction-log-writer", daemon=True
+        )
+        self._writer_thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """
+        Stop the writer thread, draining the queue for at most timeout seconds
+
+        Whatever is still queued when the deadline passes is spilled to disk
+        (or dropped) so a slow or unreachable Mongo cannot hold up shutdown.
+        """
+        self._drain_deadline = time.monotonic() + timeout
+        self._stop_event.set()
+        if self._writer_thread is not None:
+            self._writer_thread.join(timeout)
+            if self._writer_thread.is_alive():
+                print("Interaction log: writer did not finish before shutdown deadline")
+            self._writer_thread = None
+
+        leftover = self._take_batch_all()
+        if leftover:
+            print(f"Interaction log: {len(leftover)} documents left at shutdown")
+            self._overflow(leftover)
+        self._report_overflow()
+
+    def _writer_loop(self):
+        try:
+            self._recover_spill()
+        finally:
+            self.recovery_done.set()
+
+        while not self._stop_event.is_set():
+            self._write_batch(self._take_batch(timeout=self.flush_interval))
+            self._report_overflow()
+
+        # Drain on shutdown until the queue is empty or the deadline passes
+        while time.monotonic() < self._drain_deadline:
+            if not self._write_batch(self._take_batch(timeout=0)):
+                break
+
+    def _take_batch_all(self):
+        documents = []
+        while True:
+            try:
+                documents.append(self._queue.get_nowait())
+            except queue.Empty:
+                return documents
+
+    def _take_batch(self, timeout: float):
+        # Collect up to batch_size documents, waiting at most timeout seconds in total
+        batch = []
+        deadline = time.monotonic() + timeout
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_batch(self, batch):
+        if not batch:
+            return 0
+        try:
+            self.collection.insert_many(batch, ordered=False)
+            print(f"Interaction log: wrote {len(batch)} documents")
+        except BulkWriteError as e:
+            # Unordered insert: only the documents that failed need another home
+            failed = {error["index"] for error in e.details.get("writeErrors", [])}
+            print(f"Interaction log write error: {len(failed)} of {len(batch)} documents failed")
+            self._overflow([batch[index] for index in sorted(failed)])
+        except PyMongoError as e:
+            print(f"Interaction log write error: {str(e)}")
+            self._overflow(batch)
+        return len(batch)
+
+    def _overflow(self, documents):
+        # Backpressure policy: spill to disk if configured, otherwise drop.
+        # Runs on request threads, so counts are reported later by the writer.
+        with self._spill_lock:
+            if self.spill_path:
+                try:
+                    with open(self.spill_path, "a", encoding="utf-8") as spill_file:
+                        for document in documents:
+                            spill_file.write(self._spill_line(document))
+                    self.spilled += len(documents)
+                    return
+                except OSError as e:
+                    print(f"Interaction log spill error: {str(e)}")
+            self.dropped += len(documents)
+
+    def _report_overflow(self):
+        # One summary line per writer iteration instead of one per request
+        with self._spill_lock:
+            current = (self.spilled, self.dropped)
+            previous, self._reported_overflow = self._reported_overflow, current
+        if current != previous:
+            print(f"Interaction log: {current[0] - previous[0]} spilled, {current[1] - previous[1]} dropped "
+                  f"({current[0]} spilled, {current[1]} dropped in total)")
+
+    @staticmethod
+    def _spill_line(document):
+        document = {**document, "created_at": document["created_at"].isoformat()}
+        document.pop("_id", None)
+        return json.dumps(document) + "\n"
+
+    def _recover_spill(self):
+        """
+        Stream spilled documents back into Mongo in batch_size chunks
+
+        The spill file is first moved aside so new spills go to a fresh file.
+        After each written chunk the byte offset is saved next to it, so an
+        interrupted recovery (Mongo down, shutdown, crash) resumes where it
+        stopped on the next start without inserting anything twice.
+        """
+        if not self.spill_path:
+            return
+
+        recovering_path = self.spill_path + ".recovering"
+        offset_path = recovering_path + ".offset"
+
+        with self._spill_lock:
+            if not os.path.exists(recovering_path):
+                if not os.path.exists(self.spill_path):
+                    return
+                os.replace(self.spill_path, recovering_path)
+
+        offset = 0
+        if os.path.exists(offset_path):
+            try:
+                with open(offset_path, "r", encoding="utf-8") as offset_file:
+                    offset = int(offset_file.read().strip() or 0)
+            except (OSError, ValueError):
+                offset = 0
+
+        recovered = 0
+        skipped = 0
+        try:
+            with open(recovering_path, "rb") as spill_file:
+                spill_file.seek(offset)
+                at_eof = False
+                while not at_eof:
+                    if self._stop_event.is_set():
+                        return
+
+                    batch = []
+                    while len(batch) < self.batch_size:
+                        line = spill_file.readline()
+                        if not line:
+                            at_eof = True
+                            break
+                        if not line.strip():
+                            continue
+                        # A crash mid-append can leave a truncated last line
+                        try:
+                            document = json.loads(line)
+                            document["created_at"] = datetime.fromisoformat(document["created_at"])
+                        except (ValueError, KeyError, TypeError):
+                            skipped += 1
+                            continue
+                        batch.append(document)
+
+                    if batch:
+                        failed = set()
+                        try:
+                            self.collection.insert_many(batch, ordered=False)
+                        except BulkWriteError as e:
+                            # Failed documents go to the new spill file for the next start
+                            failed = {error["index"] for error in e.details.get("writeErrors", [])}
+                            self._overflow([batch[index] for index in sorted(failed)])
+                        except PyMongoError as e:
+                            # Leave the rest for the next start
+                            print(f"Interaction log spill recovery paused: {str(e)}")
+                            return
+                        recovered += len(batch) - len(failed)
+
+                    with open(offset_path, "w", encoding="utf-8") as offset_file:
+                        offset_file.write(str(spill_file.tell()))
+
+            os.remove(recovering_path)
+            if os.path.exists(offset_path):
+                os.remove(offset_path)
+        except OSError as e:
+            print(f"Interaction log spill recovery error: {str(e)}")
+        finally:
+            if recovered or skipped:
+                print(f"Interaction log: recovered {recovered} spilled documents, "
+                      f"skipped {skipped} unreadable lines")
@@ -1,5 +1,216 @@
 import requests
 import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Overpass API endpoints - the main server plus public mirrors serving the same data
+# Override with a comma-separated OVERPASS_URLS environment variable
+DEFAULT_OVERPASS_URLS = [
+    "https://overpass-api.de/api/interpreter",
+    "https://overpass.kumi.systems/api/interpreter",
+    "https://overpass.private.coffee/api/interpreter",
+]
+
+# Hedge delay = this percentile of recent primary latencies, clamped to the bounds below
+HEDGE_PERCENTILE = 0.95
+MIN_HEDGE_DELAY = 0.2
+MAX_HEDGE_DELAY = 5.0
+
+# Weight of the newest sample in each mirror's latency EWMA
+EWMA_ALPHA = 0.3
+
+# A mirror's EWMA halves for every this many seconds without a new sample, so a
+# mirror penalised by one failure drifts back to the front and gets re-probed
+EWMA_HALF_LIFE = 60.0
+
+# Per-request timeout in seconds; a failed request counts as this latency
+REQUEST_TIMEOUT = 30
+
+# Concurrent /nearby-medical calls to plan for (FastAPI runs sync endpoints in a
+# 40-thread pool); every one of them may have a request in flight to each mirror
+MAX_CONCURRENT_QUERIES = int(os.getenv("OVERPASS_MAX_CONCURRENCY", "40"))
+
+
+class OverpassMirrors:
+    """
+    Hedged requests across several Overpass API mirrors
+
+    The mirror with the lowest latency EWMA is asked first. EWMAs decay
+    while a mirror goes unused, so a mirror that was penalised for a failure
+    is eventually re-probed as primary. If the primary has not answered
+    within the hedge delay (a percentile of recent primary latencies) the
+    next-best mirror is asked as well, and so on; the first successful
+    answer wins. The hedge timer only starts once a request is
+    actually running, and hedges still queued when a winner arrives are
+    cancelled. Requests that lose the race keep running in the background
+    and still update their mirror's EWMA.
+    """
+
+    def __init__(self, urls, timeout: float = REQUEST_TIMEOUT, max_concurrency: int = MAX_CONCURRENT_QUERIES):
+        self.urls = list(urls)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        # Unknown mirrors have no EWMA yet and rank first, so each one gets tried early on
+        self._ewma = {url: None for url in self.urls}
+        self._last_sample = {url: None for url in self.urls}
+        # Latencies of primary requests only, for the hedge delay percentile
+        self._recent = deque(maxlen=100)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_concurrency) * len(self.urls),
+            thread_name_prefix="overpass"
+        )
+
+    def _decayed_ewma(self, url: str, now: float):
+        # Caller holds the lock
+        ewma = self._ewma[url]
+        if ewma is None:
+            return 0.0
+        age = max(0.0, now - self._last_sample[url])
+        return ewma * 0.5 ** (age / EWMA_HALF_LIFE)
+
+    def ranked_urls(self, now: float = None):
+        """Mirrors ordered from fastest to slowest by (decayed) latency EWMA"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            return sorted(self.urls, key=lambda url: self._decayed_ewma(url, now))
+
+    def hedge_delay(self):
+        """Seconds to wait for the current request before asking another mirror"""
+        with self._lock:
+            samples = sorted(self._recent)
+        if not samples:
+            return MAX_HEDGE_DELAY
+        index = min(len(samples) - 1, int(HEDGE_PERCENTILE * len(samples)))
+        return min(MAX_HEDGE_DELAY, max(MIN_HEDGE_DELAY, samples[index]))
+
+    def record_latency(self, url: str, seconds: float, success: bool = True,
+                       primary: bool = False, now: float = None):
+        """
+        Fold one observed latency into the mirror's EWMA
+
+        Args:
+            url: Mirror the request went to
+            seconds: Observed latency (the timeout for failed requests)
+            success: Whether the request returned a usable answer
+            primary: Whether the request was the first one sent for its query;
+                     only successful primary latencies feed the hedge delay
+            now: Sample time in monotonic seconds, defaults to time.monotonic()
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self._ewma[url] is None:
+                self._ewma[url] = seconds
+            else:
+                previous = self._decayed_ewma(url, now)
+                self._ewma[url] = EWMA_ALPHA * seconds + (1 - EWMA_ALPHA) * previous
+            self._last_sample[url] = now
+            if success and primary:
+                self._recent.append(seconds)
+
+    def _post(self, url: str, query: str, started_at: list, primary: bool):
+        started = time.monotonic()
+        started_at[0] = started
+        try:
+            response = requests.post(
+                url,
+                data=query,
+                headers={'Content-Type': 'text/plain'},
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            data = response.json()
+        except Exception:
+            # Penalise failing mirrors as if they had timed out
+            self.record_latency(url, self.timeout, success=False, primary=primary)
+            raise
+        self.record_latency(url, time.monotonic() - started, primary=primary)
+        return data
+
+    def query(self, query: str):
+        """
+        Send an Overpass QL query, hedging across mirrors
+
+        Args:
+            query: Overpass QL query text
+
+        Returns:
+            dict: Parsed JSON response from the first mirror that succeeded
+
+        Raises:
+            Exception: The last error seen if every mirror failed
+        """
+        if not self.urls:
+            raise ValueError("No Overpass API endpoints configured")
+
+        candidates = deque(self.ranked_urls())
+        delay = self.hedge_delay()
+        pending = {}
+        # Start time of the most recently launched request, set by the worker
+        latest_started = [None]
+        last_error = None
+
+        def launch_next():
+            nonlocal latest_started
+            url = candidates.popleft()
+            print(f"Overpass API: querying {url}")
+            latest_started = [None]
+            # The first launch is the primary; the rest are hedges or fall-throughs
+            primary = len(candidates) == len(self.urls) - 1
+            pending[self._executor.submit(self._post, url, query, latest_started, primary)] = url
+
+        launch_next()
+        try:
+            while pending:
+                # Hedge once the latest request has been running for the hedge delay
+                timeout = None
+                if candidates:
+                    if latest_started[0] is None:
+                        # Still waiting for a worker thread - the hedge timer has not started
+                        timeout = 0.05
+                    else:
+                        timeout = max(0.0, latest_started[0] + delay - time.monotonic())
+
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                if not done:
+                    if latest_started[0] is not None and time.monotonic() >= latest_started[0] + delay:
+                        launch_next()
+                    continue
+
+                for future in done:
+                    url = pending.pop(future)
+                    try:
+                        return future.result()
+                    except Exception as e:
+                        print(f"Overpass API mirror {url} failed: {str(e)}")
+                        last_error = e
+
+                # A mirror failed outright - try the next one without waiting
+                if candidates:
+                    launch_next()
+
+            raise last_error
+        finally:
+            # Hedges that never started are no longer needed
+            for future in pending:
+                future.cancel()
+
+overpass_urls = [
+    url.strip()
+    for url in os.getenv("OVERPASS_URLS", "").split(",")
+    if url.strip()
+]
+if not overpass_urls:
+    # Unset, empty or only commas - use the default mirrors
+    overpass_urls = DEFAULT_OVERPASS_URLS
+overpass_mirrors = OverpassMirrors(overpass_urls)
+
 
 def find_medical_places(lat: float, lon: float):
     """
@@ -18,9 +229,6 @@ def find_medical_places(lat: float, lon: float):
     """
     print(f"Overpass API search started for coordinates: {lat}, {lon}")
     
-    # Overpass API endpoint - this is the main server that processes our queries
-    overpass_url = "https://overpass-api.de/api/interpreter"
-    
     # Build Overpass QL (Query Language) query
     # This query searches for medical facilities within 1500 meters of user location
     overpass_query = f"""
@@ -49,18 +257,9 @@ def find_medical_places(lat: float, lon: float):
     print("Searching for: clinics, hospitals, pharmacies")
     
     try:
-        # Send POST request to Overpass API with our query
+        # Send the query to the configured Overpass mirrors (hedged, first answer wins)
         # Overpass API expects the query as raw text in the request body
-        response = requests.post(
-            overpass_url,
-            data=overpass_query,
-            headers={'Content-Type': 'text/plain'},
-            timeout=30
-        )
-        response.raise_for_status()
-        
-        # Parse JSON response from Overpass API
-        data = response.json()
+        data = overpass_mirrors.query(overpass_query)
         
         print(f"Overpass API returned {len(data.get('elements', []))} raw results")
         
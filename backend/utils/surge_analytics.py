@@ -0,0 +1,325 @@
+import math
+import re
+import threading
+import time
+from collections import Counter, deque
+
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+from utils.symptoms import CRITICAL_SYMPTOMS
+
+# Size of one location tile in degrees (roughly 5.5km at the equator)
+TILE_SIZE_DEG = 0.05
+
+# Width of one time bucket in seconds
+BUCKET_SECONDS = 60
+
+# Sliding windows served to the hospital dashboard (name -> seconds)
+WINDOWS = {
+    "15m": 15 * 60,
+    "1h": 60 * 60,
+    "24h": 24 * 60 * 60,
+}
+
+# Triage categories matched against the user's message, checked in order
+# so that emergency keywords always win over softer categories
+SYMPTOM_CATEGORIES = [
+    ("emergency", CRITICAL_SYMPTOMS + ["paralysis", "numbness", "confusion"]),
+    ("fever", ["fever", "temperature", "chills", "flu"]),
+    ("respiratory", ["cough", "coughing", "cold", "asthma", "breathless", "breathing", "wheezing", "sore throat", "congestion"]),
+    ("digestive", ["stomach", "vomit", "vomiting", "nausea", "diarrhea", "acidity", "indigestion", "heartburn"]),
+    ("heat", ["heat", "heatstroke", "sunburn", "dehydration", "dizzy", "dizziness"]),
+    ("injury", ["injury", "fracture", "sprain", "cut", "burn", "wound"]),
+    ("mental", ["stress", "anxiety", "depression", "sleep", "insomnia", "panic"]),
+]
+
+# One pattern per category; keywords only match whole words (plurals allowed)
+# so that e.g. "fluid" is not counted as "flu" or "heartburn" as "burn"
+_CATEGORY_PATTERNS = [
+    (category, re.compile(r"\b(?:" + "|".join(re.escape(k) for k in keywords) + r")(?:s|es)?\b"))
+    for category, keywords in SYMPTOM_CATEGORIES
+]
+
+# Category used for map searches that carry no message text
+FACILITY_SEARCH = "facility_search"
+
+
+def classify_symptom(message: str):
+    """
+    Map a free-text health question to a coarse triage category
+
+    Args:
+        message: User's health question or symptom description
+
+    Returns:
+        str: Category name, or "general" if no keyword matched
+    """
+    message_lower = message.lower()
+    for category, pattern in _CATEGORY_PATTERNS:
+        if pattern.search(message_lower):
+            return category
+    return "general"
+
+
+def location_tile(lat: float, lon: float):
+    """
+    Snap GPS coordinates to the south-west corner of their location tile
+
+    Args:
+        lat: Latitude coordinate (float)
+        lon: Longitude coordinate (float)
+
+    Returns:
+        str: Tile key in "lat,lon" form, e.g. "23.00,72.55"
+    """
+    # Integer tile indices; rounding first keeps e.g. 23.05 / 0.05 from flooring to 460
+    tile_lat = math.floor(round(lat / TILE_SIZE_DEG, 9))
+    tile_lon = math.floor(round(lon / TILE_SIZE_DEG, 9))
+    return f"{tile_lat * TILE_SIZE_DEG:.2f},{tile_lon * TILE_SIZE_DEG:.2f}"
+
+
+def valid_coordinates(lat: float, lon: float):
+    """True if lat/lon are finite and inside the valid GPS ranges"""
+    return (math.isfinite(lat) and math.isfinite(lon)
+            and -90 <= lat <= 90 and -180 <= lon <= 180)
+
+
+class SurgeAggregator:
+    """
+    Streaming demand aggregator for the hospital dashboard
+
+    Every request is counted once into a per-minute bucket keyed by
+    (location tile, triage category). For each sliding window a running
+    total is kept and adjusted as buckets enter and expire, so reading a
+    window never scans raw events. New counts are also kept aside and
+    periodically upserted into MongoDB with $inc, one document per
+    (bucket, tile, category).
+    """
+
+    def __init__(self, collection=None, flush_interval: float = 30.0):
+        self.collection = collection
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+
+        # bucket start -> Counter[(tile, category)], oldest first
+        self._buckets = {}
+        self._bucket_order = deque()
+
+        # Per-window running totals and the bucket starts they currently include
+        self._window_buckets = {name: deque() for name in WINDOWS}
+        self._by_key = {name: Counter() for name in WINDOWS}
+        self._by_tile = {name: Counter() for name in WINDOWS}
+        self._by_category = {name: Counter() for name in WINDOWS}
+        self._total = {name: 0 for name in WINDOWS}
+
+        # Counts recorded since the last flush to MongoDB
+        self._pending = Counter()
+
+        self._stop_event = threading.Event()
+        self._flush_thread = None
+
+    def record(self, lat: float, lon: float, category: str, now: float = None):
+        """
+        Count one request for the given location and triage category
+
+        Args:
+            lat: Latitude coordinate (float)
+            lon: Longitude coordinate (float)
+            category: Triage category (see classify_symptom)
+            now: Event timestamp in seconds, defaults to time.time()
+
+        Returns:
+            bool: False if the coordinates were invalid and nothing was counted
+        """
+        if not valid_coordinates(lat, lon):
+            print(f"Surge analytics: skipping invalid coordinates {lat}, {lon}")
+            return False
+
+        key = (location_tile(lat, lon), category)
+
+        with self._lock:
+            # Read the clock under the lock so buckets normally arrive in time order
+            now = time.time() if now is None else now
+            bucket_start = int(now // BUCKET_SECONDS) * BUCKET_SECONDS
+            self._add(bucket_start, key, 1)
+            self._advance(now)
+            self._pending[(bucket_start,) + key] += 1
+        return True
+
+    def _add(self, bucket_start: int, key, count: int):
+        # Count into a bucket and every window total; caller holds the lock
+        bucket = self._buckets.get(bucket_start)
+        is_new = bucket is None
+        if is_new:
+            bucket = Counter()
+            self._buckets[bucket_start] = bucket
+            self._insert_sorted(self._bucket_order, bucket_start)
+            for name in WINDOWS:
+                self._insert_sorted(self._window_buckets[name], bucket_start)
+        bucket[key] += count
+
+        for name in WINDOWS:
+            included = self._window_buckets[name]
+            # An existing bucket this window already expired must not count again;
+            # a new bucket counts everywhere and _advance expires it where needed
+            if not is_new and not (included and included[0] <= bucket_start):
+                continue
+            self._by_key[name][key] += count
+            self._by_tile[name][key[0]] += count
+            self._by_category[name][key[1]] += count
+            self._total[name] += count
+
+    def load_recent(self, now: float = None):
+        """
+        Rebuild the in-memory windows from buckets flushed to MongoDB
+
+        Called from start() so that a restart does not reset the dashboard.
+        Must run before any record() call, since buckets are appended in
+        time order.
+
+        Args:
+            now: Reference timestamp in seconds, defaults to time.time()
+
+        Returns:
+            int: Number of bucket documents loaded
+        """
+        if self.collection is None:
+            return 0
+
+        now = time.time() if now is None else now
+        oldest = int((now - max(WINDOWS.values())) // BUCKET_SECONDS) * BUCKET_SECONDS
+
+        try:
+            documents = list(
+                self.collection.find({"bucket_start": {"$gte": oldest}}).sort("bucket_start", 1)
+            )
+        except PyMongoError as e:
+            print(f"Surge analytics load error: {str(e)}")
+            return 0
+
+        with self._lock:
+            for document in documents:
+                key = (document["tile"], document["category"])
+                self._add(document["bucket_start"], key, document["count"])
+            self._advance(now)
+
+        print(f"Surge analytics: loaded {len(documents)} buckets from MongoDB")
+        return len(documents)
+
+    def snapshot(self, window: str = "1h", now: float = None):
+        """
+        Read the precomputed aggregates for one sliding window
+
+        Args:
+            window: Window name, one of WINDOWS
+            now: Reference timestamp in seconds, defaults to time.time()
+
+        Returns:
+            dict: Total count plus counts by tile, by category and by both
+        """
+        now = time.time() if now is None else now
+
+        with self._lock:
+            self._advance(now)
+            return {
+                "window": window,
+                "bucket_seconds": BUCKET_SECONDS,
+                "tile_size_deg": TILE_SIZE_DEG,
+                "total": self._total[window],
+                "by_category": dict(self._by_category[window]),
+                "by_tile": dict(self._by_tile[window]),
+                "by_tile_category": [
+                    {"tile": tile, "category": category, "count": count}
+                    for (tile, category), count in self._by_key[window].items()
+                ],
+            }
+
+    def _advance(self, now: float):
+        # Expire buckets that slid out of each window; caller holds the lock
+        for name, seconds in WINDOWS.items():
+            cutoff = now - seconds
+            included = self._window_buckets[name]
+            while included and included[0] + BUCKET_SECONDS <= cutoff:
+                expired = self._buckets[included.popleft()]
+                for (tile, category), count in expired.items():
+                    self._subtract(self._by_key[name], (tile, category), count)
+                    self._subtract(self._by_tile[name], tile, count)
+                    self._subtract(self._by_category[name], category, count)
+                    self._total[name] -= count
+
+        # Drop buckets no window refers to any more
+        longest = max(WINDOWS.values())
+        while self._bucket_order and self._bucket_order[0] + BUCKET_SECONDS <= now - longest:
+            del self._buckets[self._bucket_order.popleft()]
+
+    @staticmethod
+    def _insert_sorted(starts: deque, bucket_start: int):
+        # _advance only looks at the oldest bucket, so keep every deque in time order
+        index = len(starts)
+        while index > 0 and starts[index - 1] > bucket_start:
+            index -= 1
+        starts.insert(index, bucket_start)
+
+    @staticmethod
+    def _subtract(counter: Counter, key, count: int):
+        counter[key] -= count
+        if counter[key] <= 0:
+            del counter[key]
+
+    def flush(self):
+        """
+        Upsert counts recorded since the last flush into MongoDB
+
+        Returns:
+            int: Number of bucket documents written
+        """
+        with self._lock:
+            pending = self._pending
+            self._pending = Counter()
+
+        if not pending or self.collection is None:
+            return 0
+
+        operations = [
+            UpdateOne(
+                {"bucket_start": bucket_start, "tile": tile, "category": category},
+                {"$inc": {"count": count}},
+                upsert=True,
+            )
+            for (bucket_start, tile, category), count in pending.items()
+        ]
+
+        try:
+            self.collection.bulk_write(operations, ordered=False)
+            print(f"Surge analytics: flushed {len(operations)} buckets")
+            return len(operations)
+        except PyMongoError as e:
+            print(f"Surge analytics flush error: {str(e)}")
+            # Put the counts back so the next flush retries them
+            with self._lock:
+                self._pending.update(pending)
+            return 0
+
+    def start(self):
+        """Load recent buckets and start the background thread that flushes to MongoDB"""
+        if self._flush_thread is not None:
+            return
+        self.load_recent()
+        self._stop_event.clear()
+        self._flush_thread = threading.Thread(
+            target=self._flush_loop, name="surge-flush", daemon=True
+        )
+        self._flush_thread.start()
+
+    def stop(self):
+        """Stop the background thread and write any remaining counts"""
+        self._stop_event.set()
+        if self._flush_thread is not None:
+            self._flush_thread.join()
+            self._flush_thread = None
+        self.flush()
+
+    def _flush_loop(self):
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
@@ -0,0 +1,6 @@
+# Critical symptoms that need emergency care rather than general advice
+# Shared by the citizen agent's emergency check and surge triage counts
+CRITICAL_SYMPTOMS = [
+    "chest pain", "difficulty breathing", "unconscious", "bleeding",
+    "high fever", "fainting", "can't breathe", "heart attack", "stroke"
+]
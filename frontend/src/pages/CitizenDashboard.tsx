@@ -34,21 +34,16 @@ export default function CitizenDashboard() {
     }
   };
 
-  // Get city name from coordinates using reverse geocoding
+  // Get city name from coordinates using the backend reverse geocoder
   const getCityName = async (latitude: number, longitude: number) => {
     try {
-      const response = await fetch(
-        `https://nominatim.openstreetmap.org/reverse?lat=${latitude}&lon=${longitude}&format=json`,
-        {
-          headers: {
-            "User-Agent": "SurgeSense/1.0"
-          }
-        }
-      );
-      const data = await response.json();
-      const city = data.address?.city || data.address?.town || data.address?.village || "Unknown City";
-      const country = data.address?.country || "";
-      setCityName(`${city}, ${country}`);
+      const response = await axios.get(`/reverse-geocode?lat=${latitude}&lon=${longitude}`);
+      if (response.data.success) {
+        const { city, country } = response.data.location;
+        setCityName(country ? `${city}, ${country}` : city);
+      } else {
+        setCityName("Unknown Location");
+      }
     } catch (error) {
       console.error("City name fetch error:", error);
       setCityName("Unknown Location");
@@ -1,8 +1,126 @@
+import { useState, useEffect } from "react";
+import axios from "axios";
+
+axios.defaults.baseURL = "http://127.0.0.1:8000";
+
+// Sliding windows served by the backend /surge endpoint
+const WINDOWS = ["15m", "1h", "24h"];
+
+interface SurgeData {
+  window: string;
+  total: number;
+  by_category: Record<string, number>;
+  by_tile: Record<string, number>;
+  by_tile_category: { tile: string; category: string; count: number }[];
+}
+
 export default function HospitalDashboard() {
+  const [timeWindow, setTimeWindow] = useState<string>("1h");
+  const [surge, setSurge] = useState<SurgeData | null>(null);
+  const [error, setError] = useState<string>("");
+
+  // Fetch precomputed surge aggregates for the selected window
+  const fetchSurge = async (selectedWindow: string) => {
+    try {
+      const response = await axios.get(`/surge?window=${selectedWindow}`);
+      if (response.data.success) {
+        setSurge(response.data.surge);
+        setError("");
+      } else {
+        setError(response.data.message);
+      }
+    } catch (err) {
+      console.error("Surge fetch error:", err);
+      setError("Unable to load surge analytics");
+    }
+  };
+
+  // Refresh every 30 seconds while the dashboard is open
+  useEffect(() => {
+    fetchSurge(timeWindow);
+    const interval = setInterval(() => fetchSurge(timeWindow), 30000);
+    return () => clearInterval(interval);
+  }, [timeWindow]);
+
+  const topTiles = surge
+    ? Object.entries(surge.by_tile).sort((a, b) => b[1] - a[1]).slice(0, 10)
+    : [];
+  const categories = surge
+    ? Object.entries(surge.by_category).sort((a, b) => b[1] - a[1])
+    : [];
+
   return (
     <div style={{ padding: 20 }}>
       <h1>Hospital Dashboard</h1>
       <p>Welcome to the hospital portal</p>
+
+      {/* Window Selector */}
+      <div style={{ display: "flex", gap: 10, marginBottom: 20 }}>
+        {WINDOWS.map((w) => (
+          <button
+            key={w}
+            onClick={() => setTimeWindow(w)}
+            style={{
+              padding: "8px 16px",
+              backgroundColor: w === timeWindow ? "#007bff" : "#e9ecef",
+              color: w === timeWindow ? "white" : "#333",
+              border: "none",
+              borderRadius: "6px",
+              cursor: "pointer"
+            }}
+          >
+            Last {w}
+          </button>
+        ))}
+      </div>
+
+      {error && <p style={{ color: "#dc3545" }}>{error}</p>}
+
+      {surge && (
+        <div>
+          <h3>📈 Requests in window: {surge.total}</h3>
+
+          <div style={{ display: "flex", gap: 40, flexWrap: "wrap" }}>
+            {/* Demand by Triage Category */}
+            <div>
+              <h3>🩺 By Triage Category</h3>
+              {categories.length === 0 ? (
+                <p>No requests yet</p>
+              ) : (
+                <table>
+                  <tbody>
+                    {categories.map(([category, count]) => (
+                      <tr key={category}>
+                        <td style={{ paddingRight: 20 }}>{category}</td>
+                        <td>{count}</td>
+                      </tr>
+                    ))}
+                  </tbody>
+                </table>
+              )}
+            </div>
+
+            {/* Busiest Location Tiles */}
+            <div>
+              <h3>📍 Busiest Areas</h3>
+              {topTiles.length === 0 ? (
+                <p>No requests yet</p>
+              ) : (
+                <table>
+                  <tbody>
+                    {topTiles.map(([tile, count]) => (
+                      <tr key={tile}>
+                        <td style={{ paddingRight: 20 }}>{tile}</td>
+                        <td>{count}</td>
+                      </tr>
+                    ))}
+                  </tbody>
+                </table>
+              )}
+            </div>
+          </div>
+        </div>
+      )}
     </div>
   );
-}
\ No newline at end of file
+}